@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dev_server.py
+Lokaler Webserver für dist/ mit Caching wie im Produktivbetrieb und Live-Reload.
+
+ - starke ETags (SHA-1 des Inhalts) und 304-Antworten bei If-None-Match
+ - gzip- bzw. brotli-Varianten (brotli nur, wenn das Modul installiert ist),
+   einmal erzeugt und im Speicher gehalten (LRU mit Byte-Budget)
+ - Query-Strings wie ?v=<dashboardVersion> werden für die Dateiauswahl ignoriert;
+   ob neu geladen wird, entscheidet allein der ETag
+ - überwacht den dataFolder aus config.json, prüft geänderte JSONs, kopiert sie
+   wie gulpfile.js nach dist/ und schickt den Browsern ein Reload-Event
+ - /__stats liefert Trefferzahlen und übertragene Bytes als JSON
+
+Aufruf:
+    python3 tools/dev_server.py                 # http://localhost:8080/index.html
+    python3 tools/dev_server.py --port 9000 --fix
+"""
+import argparse
+import asyncio
+import fnmatch
+import gzip
+import hashlib
+import json
+import mimetypes
+import shutil
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from prune_dist import ROOT, DIST_DIR, load_config, source_layout
+from analyze_functions import analyze_file
+from fix_functions_json import process_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml")
+MIN_COMPRESS_SIZE = 512
+POLL_INTERVAL = 0.5
+# Backups der tools/-Skripte sowie Temp-Dateien von Editoren nicht nach dist/ übernehmen
+IGNORED_NAMES = ("*.bak", "*.pretype", "*~", "*.swp", "*___jb_*")
+
+RELOAD_PATH = "/__reload"
+STATS_PATH = "/__stats"
+RELOAD_SNIPPET = (
+    b"<script>new EventSource('" + RELOAD_PATH.encode() + b"')"
+    b".addEventListener('reload', () => location.reload());</script>\n"
+)
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("font/woff2", ".woff2")
+mimetypes.add_type("application/json", ".json")
+mimetypes.add_type("application/javascript", ".js")
+
+
+class FileCache:
+    """
+    LRU-Cache für ausgelieferte Varianten, Schlüssel (Pfad, Encoding).
+    Einträge gelten, solange mtime und Größe der Datei unverändert sind.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path, encoding, stat):
+        key = (path, encoding)
+        entry = self.entries.get(key)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["source_size"] == stat.st_size:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, path: Path, encoding, stat, body, etag):
+        key = (path, encoding)
+        old = self.entries.pop(key, None)
+        if old:
+            self.size -= len(old["body"])
+        entry = {"mtime": stat.st_mtime_ns, "source_size": stat.st_size, "body": body, "etag": etag}
+        if len(body) > self.max_bytes:
+            return entry
+        self.entries[key] = entry
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted["body"])
+        return entry
+
+
+class DevServer:
+    def __init__(self, dist: Path, config, cache_bytes, fix=False):
+        self.dist = dist.resolve()
+        self.config = config
+        self.data_folder = config.get("dataFolder", "data")
+        self.fix = fix
+        self.cache = FileCache(cache_bytes)
+        self.clients = set()
+        self.by_source = {}
+        self.stats = {"requests": 0, "not_modified": 0, "bytes_sent": 0, "bytes_saved": 0}
+
+    # --- HTTP ---
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.send(writer, 400, {}, b"Bad Request")
+                    break
+                path = unquote(urlsplit(target).path)
+
+                if path == RELOAD_PATH:
+                    await self.event_stream(writer)
+                    break
+                if method not in ("GET", "HEAD"):
+                    await self.send(writer, 405, {"Allow": "GET, HEAD"}, b"Method Not Allowed")
+                elif path == STATS_PATH:
+                    await self.send(writer, 200, {"Content-Type": "application/json", "Cache-Control": "no-store"},
+                                    json.dumps(self.get_stats(), indent=2).encode())
+                else:
+                    await self.serve_file(writer, method, path, headers)
+
+                if version == "HTTP/1.0" or headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, headers, body=b"", head=False):
+        reason = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed"}.get(status, "")
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        headers = dict(headers)
+        if status != 304:
+            headers.setdefault("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if status != 304 and not head:
+            writer.write(body)
+            self.stats["bytes_sent"] += len(body)
+        await writer.drain()
+
+    def resolve(self, url_path):
+        rel = url_path.lstrip("/") or "index.html"
+        target = (self.dist / rel).resolve()
+        if target.is_dir():
+            target = target / "index.html"
+        if self.dist not in target.parents or not target.is_file():
+            return None
+        return target
+
+    async def serve_file(self, writer, method, url_path, headers):
+        self.stats["requests"] += 1
+        target = self.resolve(url_path)
+        if target is None:
+            await self.send(writer, 404, {"Content-Type": "text/plain"}, b"Not Found", method == "HEAD")
+            return
+
+        content_type = mimetypes.guess_type(target.name)[0] or "application/octet-stream"
+        encoding = None
+        if content_type.startswith(COMPRESSIBLE) and target.stat().st_size >= MIN_COMPRESS_SIZE:
+            encoding = choose_encoding(headers.get("accept-encoding", ""))
+        entry = self.load(target, encoding)
+
+        response_headers = {
+            "Content-Type": content_type + ("; charset=utf-8" if content_type.startswith("text/") else ""),
+            "ETag": entry["etag"],
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+
+        if etag_matches(headers.get("if-none-match", ""), entry["etag"]):
+            self.stats["not_modified"] += 1
+            self.stats["bytes_saved"] += len(entry["body"])
+            await self.send(writer, 304, response_headers)
+            return
+        await self.send(writer, 200, response_headers, entry["body"], method == "HEAD")
+
+    def load(self, target: Path, encoding):
+        stat = target.stat()
+        entry = self.cache.get(target, encoding, stat)
+        if entry:
+            return entry
+        body = target.read_bytes()
+        if target.name == "index.html":
+            body = body.replace(b"</body>", RELOAD_SNIPPET + b"</body>", 1)
+        # Starker ETag je Repräsentation: Inhalt + Encoding
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + (f"-{encoding}" if encoding else "") + '"'
+        if encoding == "br":
+            body = brotli.compress(body)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=9, mtime=0)
+        return self.cache.put(target, encoding, stat, body, etag)
+
+    def get_stats(self):
+        return dict(self.stats, cache_entries=len(self.cache.entries), cache_bytes=self.cache.size,
+                    cache_hits=self.cache.hits, cache_misses=self.cache.misses, reload_clients=len(self.clients))
+
+    # --- Live-Reload ---
+    async def event_stream(self, writer):
+        # ohne Content-Length, die Verbindung bleibt offen
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-store\r\nConnection: keep-alive\r\n\r\n")
+        await writer.drain()
+        queue = asyncio.Queue()
+        self.clients.add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                    writer.write(f"event: reload\ndata: {json.dumps(event)}\n\n".encode())
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(queue)
+
+    def notify(self, changed):
+        for queue in self.clients:
+            queue.put_nowait(changed)
+
+    # --- Dateiüberwachung ---
+    async def watch(self):
+        snapshot = self.scan()
+        self.by_source = self.source_map()
+        while True:
+            await asyncio.sleep(POLL_INTERVAL)
+            try:
+                current = self.scan()
+                changed = [p for p, m in current.items() if snapshot.get(p) != m]
+                removed = [p for p in snapshot if p not in current]
+                snapshot = current
+                if not changed and not removed:
+                    continue
+                synced = self.sync(changed, removed)
+                # Von --fix neu geschriebene Dateien nicht als weitere Änderung melden
+                snapshot.update((p, m) for p, m in self.scan().items() if p in changed)
+                if synced:
+                    print("[RELOAD]", ", ".join(synced))
+                    self.notify(synced)
+            except Exception as e:
+                print(f"[WARN] Dateiüberwachung: {e}")
+
+    def scan(self):
+        data_dir = ROOT / self.data_folder
+        result = {}
+        for p in data_dir.rglob("*"):
+            if is_ignored(p.name):
+                continue
+            try:
+                if p.is_file():
+                    st = p.stat()
+                    result[p] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                # kurzlebige Dateien (atomares Speichern) sind schon wieder weg
+                continue
+        return result
+
+    def source_map(self):
+        return {src.resolve(): rel for rel, src in source_layout(self.data_folder).items()}
+
+    def sync(self, changed, removed):
+        """Prüft geänderte Dateien und spiegelt sie gemäß gulpfile.js nach dist/."""
+        # Gelöschte Dateien über die vorherige Zuordnung auflösen
+        previous = self.by_source
+        self.by_source = self.source_map()
+        current = {rel: src for src, rel in self.by_source.items()}
+        synced = []
+        for src in changed:
+            rel = self.by_source.get(src.resolve())
+            if rel is None:
+                continue
+            try:
+                if src.suffix == ".json" and not self.validate(src):
+                    continue
+                dest = self.dist / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dest)
+                synced.append(rel)
+            except OSError as e:
+                print(f"[WARN] {rel}: nicht übernommen: {e}")
+        for src in removed:
+            rel = previous.get(src.resolve())
+            if rel is None:
+                continue
+            dest = self.dist / rel
+            try:
+                if rel in current:
+                    # z. B. data/img überdeckte assets/img: Original wieder einsetzen
+                    shutil.copy2(current[rel], dest)
+                elif dest.is_file():
+                    dest.unlink()
+                else:
+                    continue
+                synced.append(rel)
+            except OSError as e:
+                print(f"[WARN] {rel}: nicht entfernt: {e}")
+        return synced
+
+    def validate(self, src: Path):
+        try:
+            json.loads(src.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[WARN] {src.relative_to(ROOT)}: JSON-Fehler, nicht übernommen: {e}")
+            return False
+        functions_dir = ROOT / self.data_folder / "devices" / "functions"
+        if src.parent == functions_dir:
+            if self.fix:
+                res = process_file(src)
+                if res.get("fixed"):
+                    print(f"[FIX] {src.name}: {res.get('placeholders', 0)} Platzhalter, Backup als .bak")
+            info = analyze_file(src)
+            if info.get("missing"):
+                print(f"[WARN] {src.name}: {info['missing']} von {info['total_devices']} Devices ohne value")
+        return True
+
+
+def is_ignored(name):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in IGNORED_NAMES)
+
+
+def choose_encoding(accept_encoding):
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def serve(args):
+    config = load_config(args.prod)
+    server_state = DevServer(args.dist, config, args.cache_mb * 1024 * 1024, args.fix)
+    server = await asyncio.start_server(server_state.handle, args.host, args.port)
+    print(f"Dashboard: http://{args.host}:{args.port}/index.html  (dist: {args.dist})")
+    print(f"Überwache: {ROOT / server_state.data_folder}  brotli: {'ja' if brotli else 'nein'}")
+    async with server:
+        await asyncio.gather(server.serve_forever(), server_state.watch())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokaler Webserver für dist/ mit ETags, Kompression und Live-Reload.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--dist", type=Path, default=DIST_DIR, help="dist-Ordner (Standard: %(default)s)")
+    parser.add_argument("--prod", action="store_true", help="config_prod.json statt config.json verwenden")
+    parser.add_argument("--cache-mb", type=int, default=64, help="Größe des Speicher-Caches in MB")
+    parser.add_argument("--fix", action="store_true",
+                        help="geänderte Dateien in devices/functions mit fix_functions_json.py reparieren")
+    args = parser.parse_args(argv)
+
+    if not args.dist.is_dir():
+        print(f"FEHLER: dist-Ordner nicht gefunden: {args.dist} (zuerst gulp ausführen)")
+        sys.exit(1)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Beendet.")
+
+
+if __name__ == "__main__":
+    main()
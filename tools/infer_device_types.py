@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+infer_device_types.py
+Leitet device.type für Geräte in data/devices/*/*.json aus der State-ID ab,
+optional ergänzt um common.role aus einem lokalen ioBroker-Objekt-Export.
+
+Die Regeln stehen in tools/device_type_rules.json (oder --rules <datei>):
+ - id_rules:   State-ID-Muster, segmentweise: "*" = genau ein Segment,
+               "**" = beliebig viele Segmente, sonst fnmatch je Segment
+               (z. B. "zigbee2mqtt.*.*.state", "sonoff.*.*.POWER[0-9]");
+               optional mit "name" als zusätzlicher Bedingung
+ - role_rules: common.role, spezifischste Rolle gewinnt ("switch.light" vor "switch")
+ - name_rules: regulärer Ausdruck auf Gerätename und State-ID (schwacher Hinweis)
+
+Die ID-Muster werden einmal in einen Präfix-Baum übersetzt; alle Geräte aller
+Dateien werden in einem Durchlauf klassifiziert, gleiche IDs nur einmal.
+Treffen mehrere Regeln denselben Typ, werden ihre Konfidenzen kombiniert
+(1 - Π(1 - c)); der Typ mit der höchsten Konfidenz gewinnt.
+
+Vorhandene types werden nur ab min_confidence ersetzt, fehlende immer mit dem
+besten Treffer gefüllt; Typen aus keep_types bleiben unangetastet.
+Standard ist ein Probelauf mit Diff. Mit --write werden die Dateien geändert,
+vorher wird je Datei ein Backup <name>.pretype angelegt.
+
+Aufruf:
+    python3 tools/infer_device_types.py
+    python3 tools/infer_device_types.py --objects objects.json data/devices/functions
+    python3 tools/infer_device_types.py --min-confidence 0.8 --write
+"""
+import argparse
+import fnmatch
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEV_DIR = ROOT / "data" / "devices"
+DEFAULT_RULES = Path(__file__).resolve().parent / "device_type_rules.json"
+DEFAULT_DIRS = ("functions", "rooms", "informations")
+
+# Gerätetypen, die mainDevice.js darstellen kann
+KNOWN_TYPES = {"light", "heater", "window", "button", "door", "plug", "media", "temperature",
+               "ioBroker_ical", "iframe", "switch", "html", "link"}
+
+
+class TrieNode:
+    __slots__ = ("literal", "globs", "star", "globstar", "rules")
+
+    def __init__(self):
+        self.literal = {}
+        self.globs = []
+        self.star = None
+        self.globstar = None
+        self.rules = []
+
+
+class PatternTrie:
+    """Präfix-Baum über punktgetrennte State-ID-Muster."""
+
+    def __init__(self):
+        self.root = TrieNode()
+
+    def add(self, pattern, rule):
+        node = self.root
+        for seg in pattern.split("."):
+            if seg == "**":
+                node.globstar = node.globstar or TrieNode()
+                node = node.globstar
+            elif seg == "*":
+                node.star = node.star or TrieNode()
+                node = node.star
+            elif any(c in seg for c in "*?["):
+                for glob, child in node.globs:
+                    if glob == seg:
+                        node = child
+                        break
+                else:
+                    child = TrieNode()
+                    node.globs.append((seg, child))
+                    node = child
+            else:
+                node = node.literal.setdefault(seg, TrieNode())
+        node.rules.append(rule)
+
+    def match(self, state_id):
+        segments = state_id.split(".")
+        found = []
+        seen = set()
+
+        def walk(node, i):
+            key = (id(node), i)
+            if key in seen:
+                return
+            seen.add(key)
+            if node.globstar is not None:
+                for j in range(i, len(segments) + 1):
+                    walk(node.globstar, j)
+            if i == len(segments):
+                found.extend(node.rules)
+                return
+            seg = segments[i]
+            child = node.literal.get(seg)
+            if child is not None:
+                walk(child, i + 1)
+            if node.star is not None:
+                walk(node.star, i + 1)
+            for glob, child in node.globs:
+                if fnmatch.fnmatchcase(seg, glob):
+                    walk(child, i + 1)
+
+        walk(self.root, 0)
+        return found
+
+
+class RuleEngine:
+    def __init__(self, rules, objects=None):
+        self.min_confidence = float(rules.get("min_confidence", 0.6))
+        self.keep_types = set(rules.get("keep_types", []))
+        self.trie = PatternTrie()
+        self.roles = {}
+        self.names = []
+        for r in rules.get("id_rules", []):
+            rule = self._rule(r, "id:" + r["id"])
+            if r.get("name"):
+                rule["name"] = re.compile(r["name"], re.IGNORECASE)
+                rule["label"] += " +name:" + r["name"]
+            self.trie.add(r["id"], rule)
+        for r in rules.get("role_rules", []):
+            self.roles[r["role"]] = self._rule(r, "role:" + r["role"])
+        for r in rules.get("name_rules", []):
+            self.names.append((re.compile(r["name"], re.IGNORECASE), self._rule(r, "name:" + r["name"])))
+        self.objects = objects or {}
+        self._id_cache = {}
+
+    @staticmethod
+    def _rule(r, label):
+        if r["type"] not in KNOWN_TYPES:
+            raise ValueError(f"Regel {label}: unbekannter type '{r['type']}'")
+        return {"type": r["type"], "confidence": float(r["confidence"]), "label": label}
+
+    def role_rule(self, state_id):
+        role = self.objects.get(state_id)
+        while role:
+            if role in self.roles:
+                return self.roles[role]
+            role = role.rpartition(".")[0]
+        return None
+
+    def id_evidence(self, state_id):
+        # ID- und Rollen-Treffer hängen nur von der ID ab und werden gecacht
+        cached = self._id_cache.get(state_id)
+        if cached is None:
+            cached = list(self.trie.match(state_id))
+            role = self.role_rule(state_id)
+            if role:
+                cached.append(role)
+            self._id_cache[state_id] = cached
+        return cached
+
+    def classify(self, state_id, name=""):
+        """Gibt (type, confidence, labels) zurück oder None, wenn keine Regel passt."""
+        text = f"{name} {state_id}"
+        evidence = [r for r in self.id_evidence(state_id) if "name" not in r or r["name"].search(text)]
+        for regex, rule in self.names:
+            if regex.search(text):
+                evidence.append(rule)
+        if not evidence:
+            return None
+        scores = {}
+        for rule in evidence:
+            remaining, labels = scores.get(rule["type"], (1.0, []))
+            scores[rule["type"]] = (remaining * (1.0 - rule["confidence"]), labels + [rule["label"]])
+        dev_type, (remaining, labels) = min(scores.items(), key=lambda s: s[1][0])
+        return dev_type, round(1.0 - remaining, 3), labels
+
+
+def load_objects(path: Path):
+    """Liest einen Objekt-Export ({id: obj} oder [obj mit _id]) und liefert {id: common.role}."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    items = data.items() if isinstance(data, dict) else ((o.get("_id"), o) for o in data if isinstance(o, dict))
+    roles = {}
+    for obj_id, obj in items:
+        role = (obj.get("common") or {}).get("role") if isinstance(obj, dict) else None
+        if obj_id and isinstance(role, str) and role:
+            roles[obj_id] = role
+    return roles
+
+
+def is_state_id(value):
+    return (isinstance(value, str) and "." in value
+            and value != "xxx" and not value.startswith("MISSING__"))
+
+
+def collect_devices(doc):
+    """Liefert (category, device) für alle Geräte-Dicts mit echter State-ID."""
+    out = []
+
+    def walk(node, category):
+        if isinstance(node, list):
+            for item in node:
+                walk(item, category)
+        elif isinstance(node, dict):
+            category = node.get("category", category)
+            if "value" in node and is_state_id(node.get("value")):
+                out.append((category, node))
+            for key in ("devices", "content"):
+                if isinstance(node.get(key), list):
+                    walk(node[key], category)
+
+    walk(doc, "")
+    return out
+
+
+def find_files(paths):
+    if not paths:
+        paths = [DEV_DIR / d for d in DEFAULT_DIRS]
+    files = []
+    for p in paths:
+        p = Path(p).resolve()
+        files.extend(sorted(p.glob("*.json")) if p.is_dir() else [p])
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Leitet device.type aus State-IDs und Objekt-Rollen ab.")
+    parser.add_argument("paths", nargs="*", help="JSON-Dateien oder Ordner (Standard: data/devices/{functions,rooms,informations})")
+    parser.add_argument("--rules", type=Path, default=DEFAULT_RULES, help="Regeldatei (Standard: %(default)s)")
+    parser.add_argument("--objects", type=Path, help="ioBroker-Objekt-Export für common.role")
+    parser.add_argument("--min-confidence", type=float, help="überschreibt min_confidence aus der Regeldatei")
+    parser.add_argument("--write", action="store_true", help="Änderungen schreiben (Backup *.pretype)")
+    args = parser.parse_args(argv)
+
+    try:
+        rules = json.loads(args.rules.read_text(encoding="utf-8"))
+        engine = RuleEngine(rules, load_objects(args.objects) if args.objects else None)
+    except Exception as e:
+        print(f"FEHLER: {e}")
+        sys.exit(1)
+    if args.min_confidence is not None:
+        engine.min_confidence = args.min_confidence
+
+    started = time.perf_counter()
+    docs = {}
+    batch = []
+    for path in find_files(args.paths):
+        try:
+            docs[path] = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[WARN] {path.name}: JSON-Fehler: {e}")
+            continue
+        batch.extend((path, cat, dev) for cat, dev in collect_devices(docs[path]))
+
+    changes = {}
+    stats = {"devices": len(batch), "unmatched": 0, "kept": 0, "low_confidence": 0, "unchanged": 0}
+    for path, category, dev in batch:
+        current = dev.get("type")
+        if current in engine.keep_types:
+            stats["kept"] += 1
+            continue
+        result = engine.classify(dev["value"], str(dev.get("name") or ""))
+        if result is None:
+            stats["unmatched"] += 1
+            continue
+        new_type, confidence, labels = result
+        if new_type == current:
+            stats["unchanged"] += 1
+        elif current and confidence < engine.min_confidence:
+            stats["low_confidence"] += 1
+        else:
+            changes.setdefault(path, []).append((category, dev, current, new_type, confidence, labels))
+    elapsed = time.perf_counter() - started
+
+    for path, items in changes.items():
+        print(f"--- {path.relative_to(ROOT) if ROOT in path.parents else path}")
+        for category, dev, current, new_type, confidence, labels in items:
+            print(f"  [{category}] {dev.get('name')}: {current or '-'} -> {new_type} "
+                  f"({confidence:.2f}, {', '.join(labels)})  {dev['value']}")
+
+    if args.write:
+        for path, items in changes.items():
+            for _, dev, _, new_type, _, _ in items:
+                dev["type"] = new_type
+            backup = path.with_suffix(path.suffix + ".pretype")
+            if not backup.exists():
+                backup.write_text(path.read_text(encoding="utf-8"), encoding="utf-8")
+            path.write_text(json.dumps(docs[path], ensure_ascii=False, indent=2), encoding="utf-8")
+
+    changed = sum(len(items) for items in changes.values())
+    print(f"\nGeräte: {stats['devices']}, geändert: {changed}, unverändert: {stats['unchanged']}, "
+          f"geschützt: {stats['kept']}, ohne Regel: {stats['unmatched']}, "
+          f"unter min_confidence ({engine.min_confidence}): {stats['low_confidence']}")
+    print(f"Klassifiziert in {elapsed * 1000:.1f} ms ({len(engine._id_cache)} eindeutige IDs)")
+    print("Geschrieben." if args.write else "Probelauf, nichts geschrieben (--write zum Übernehmen).")
+
+
+if __name__ == "__main__":
+    main()
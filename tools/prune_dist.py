@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+prune_dist.py
+Erreichbarkeitsanalyse für das Dashboard: ermittelt, welche Dateien aus
+data/ und assets/img/ vom Dashboard tatsächlich geladen werden, und entfernt
+alles andere aus dist/ (Backups, *.bak/*.pretype, Demo-Daten, verwaiste
+Geräte-JSONs, ungenutzte Bilder).
+
+Startpunkte:
+ - config.json (pages, mode)
+ - users.json (Icons, Themes, overview_<user>.json, sidebar_<user>.json)
+ - sidebar.json (Wetter-Icons, Kalenderbilder)
+ - overview.json und data/main/*.json aus config.pages
+
+Von dort werden alle Referenzen verfolgt: Kachel-"json" und "image",
+Geräte-Bilder (image, imageOn/imageOff, iconset), Kanallisten
+(channellists[].list) samt Kanalbildern und "link"-Geräte auf Funktionsseiten.
+Zusätzlich werden feste Bildpfade aus assets/js, assets/css und index.html
+übernommen.
+
+Betrachtet werden nur dist/data, dist/assets/img und dist/assets/css/users;
+Bundles, Webfonts, index.html und config.json bleiben unangetastet.
+
+Aufruf:
+    python3 tools/prune_dist.py                 # nur Bericht (dist/ oder Quellen)
+    python3 tools/prune_dist.py --prod          # mit config_prod.json
+    python3 tools/prune_dist.py --manifest manifest.json
+    python3 tools/prune_dist.py --apply         # dist/ wirklich ausdünnen
+"""
+import argparse
+import fnmatch
+import json
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DIST_DIR = ROOT / "dist"
+
+# Bereiche in dist/, die aus den Daten befüllt werden und ausgedünnt werden dürfen
+PRUNE_SCOPE = ("data/", "assets/img/", "assets/css/users/")
+
+# Immer behalten: dynamisch zusammengesetzte Standardpfade und Dateien, die
+# nicht über eine JSON-Referenz erreichbar sind
+ALWAYS_KEEP = (
+    "assets/img/favicon/*",                  # index.html + favicon/manifest.json
+    "assets/img/devices/light/light.png",    # deviceLights.js ohne iconset
+    "assets/img/users/anonym.png",           # login.js Fallback
+    "assets/css/users/default.css",          # login.js Fallback
+)
+
+# Quellen, aus denen feste Bildpfade übernommen werden
+CODE_SOURCES = ("assets/js/*.js", "assets/css/*.css", "index.html")
+CODE_IMG_RE = re.compile(r"(?:\.\./|/?assets/)img/[A-Za-z0-9_./-]+\.(?:png|jpe?g|svg|webp|gif|ico)")
+
+# Bildordner je Gerätetyp für das Feld "image" (siehe deviceButton.js/deviceMedia.js)
+DEVICE_IMAGE_DIRS = {
+    "button": "assets/img/devices/button",
+    "media": "assets/img/devices/media",
+}
+# imageOn/imageOff werden von devicePlug.js für plug und switch genutzt
+PLUG_TYPES = ("plug", "switch")
+
+# Entspricht functionsMap in mainDevice.js (case 'link')
+FUNCTIONS_LINK_MAP = {
+    "Licht": "licht",
+    "Ambiente": "ambiente",
+    "Schalter": "schalter",
+    "Türen/Fenster": "tueren_fenster",
+    "Aktiv": "aktiv",
+    "Dashboards": "dashboards",
+}
+
+
+def load_config(prod=False):
+    config_file = ROOT / ("config_prod.json" if prod else "config.json")
+    try:
+        return json.loads(config_file.read_text(encoding="utf-8"))
+    except Exception as e:
+        print(f"FEHLER: {config_file} konnte nicht geladen werden: {e}")
+        sys.exit(1)
+
+
+def _files_below(base: Path):
+    if not base.is_dir():
+        return
+    for p in sorted(base.rglob("*")):
+        if p.is_file():
+            yield p.relative_to(base).as_posix(), p
+
+
+def source_layout(data_folder: str, prod=False):
+    """
+    Bildet die Kopier-Tasks aus gulpfile.js nach und liefert
+    {dist-relativer Pfad: Quelldatei}.
+    """
+    data_dir = ROOT / data_folder
+    layout = {}
+    # copyAssets
+    for rel, p in _files_below(ROOT / "assets" / "img"):
+        layout["assets/img/" + rel] = p
+    # copyOtherImages (überschreibt gleichnamige Dateien aus assets/img)
+    for rel, p in _files_below(data_dir / "img"):
+        layout["assets/img/" + rel] = p
+    # copyUserStyles
+    for rel, p in _files_below(data_dir / "theme"):
+        if "/" not in rel:
+            layout["assets/css/users/" + rel] = p
+    # copyData
+    for rel, p in _files_below(data_dir):
+        if rel.startswith(("img/", "theme/")):
+            continue
+        layout["data/" + rel] = p
+    # copyConfig
+    layout["config.json"] = ROOT / ("config_prod.json" if prod else "config.json")
+    return layout
+
+
+def dist_layout(dist: Path):
+    return dict(_files_below(dist))
+
+
+class Reachability:
+    """Sammelt erreichbare dist-Pfade, ausgehend von den Start-JSONs."""
+
+    def __init__(self, layout, config):
+        self.layout = layout
+        self.config = config
+        self.patterns = set(ALWAYS_KEEP)
+        self.keep = set()
+        self.missing = {}
+        self.errors = []
+        self._visited = set()
+
+    # --- Referenzen ---
+    def ref(self, path, referrer, optional=False):
+        """Markiert einen dist-Pfad als erreichbar. Gibt True zurück, wenn er existiert."""
+        if path in self.layout:
+            self.keep.add(path)
+            return True
+        if not optional:
+            self.missing.setdefault(path, referrer)
+        return False
+
+    def load(self, path, referrer, optional=False):
+        """Referenziert eine JSON-Datei und gibt ihren Inhalt zurück (einmalig pro Datei)."""
+        if not self.ref(path, referrer, optional) or path in self._visited:
+            return None
+        self._visited.add(path)
+        try:
+            return json.loads(self.layout[path].read_text(encoding="utf-8"))
+        except Exception as e:
+            self.errors.append(f"{path}: JSON-Fehler: {e}")
+            return None
+
+    # --- Walker ---
+    def walk(self):
+        pages = list(self.config.get("pages", []))
+        # startApp.js: im Demo-Modus wird demo.json zusätzlich geladen
+        if self.config.get("mode") == "demo":
+            pages.append("demo.json")
+
+        self.walk_code()
+
+        users = self.load("data/users.json", "config.json") or []
+        user_ids = [u.get("user") for u in users if isinstance(u, dict) and u.get("user")]
+        for u in users:
+            if isinstance(u, dict) and u.get("icon"):
+                self.ref(f"assets/img/users/{u['icon']}", "data/users.json")
+
+        sidebar_files = ["sidebar.json"] + [f"sidebar_{u}.json" for u in user_ids]
+        overview_files = ["overview.json"] + [f"overview_{u}.json" for u in user_ids]
+        for name in sidebar_files:
+            self.walk_sidebar(self.load(f"data/{name}", "data/users.json", optional=name != "sidebar.json"), name)
+        for name in overview_files:
+            doc = self.load(f"data/{name}", "data/users.json", optional=name != "overview.json")
+            if isinstance(doc, dict):
+                self.walk_devices(doc.get("content", []), f"data/{name}")
+        for u in user_ids:
+            self.ref(f"assets/css/users/{u}.css", "data/users.json", optional=True)
+
+        for page in pages:
+            self.walk_page(self.load(f"data/main/{page}", "config.json"), f"data/main/{page}")
+
+    def walk_code(self):
+        for pattern in CODE_SOURCES:
+            for src in sorted(ROOT.glob(pattern)):
+                text = src.read_text(encoding="utf-8", errors="ignore")
+                for m in CODE_IMG_RE.finditer(text):
+                    # ../img/ (CSS) und /assets/img/ (index.html) auf dist-Pfade abbilden
+                    path = "assets/img/" + m.group(0).split("img/", 1)[1]
+                    self.ref(path, src.relative_to(ROOT).as_posix())
+
+    def walk_sidebar(self, doc, referrer):
+        if not isinstance(doc, dict):
+            return
+        weather = doc.get("openWeatherMap") or {}
+        if weather.get("enabled"):
+            # sidebarWeather.js: assets/img/sidebar/weather/<imageSet>/<icon>.<imageType>
+            image_set = weather.get("imageSet") or 1
+            image_type = weather.get("imageType") or "svg"
+            self.patterns.add(f"assets/img/sidebar/weather/{image_set}/*.{image_type}")
+        ical = doc.get("ioBroker_ical") or {}
+        if ical.get("enabled"):
+            for cal in ical.get("calendars", []):
+                if isinstance(cal, dict) and cal.get("image"):
+                    self.ref(f"assets/img/devices/ioBroker_ical/{cal['image']}", referrer)
+
+    def walk_page(self, page, referrer):
+        if not isinstance(page, dict):
+            return
+        page_type = page.get("type") or Path(referrer).stem
+        for section in page.get("content", []):
+            if not isinstance(section, dict):
+                continue
+            # overview-ähnliche Seiten enthalten Geräte direkt
+            self.walk_devices(section.get("devices", []), referrer)
+            for tile in section.get("tiles", []) or []:
+                if not isinstance(tile, dict):
+                    continue
+                if tile.get("image"):
+                    self.ref(f"assets/img/main/{page_type}/{tile['image']}", referrer)
+                if tile.get("json"):
+                    path = f"data/devices/{page_type}/{tile['json']}.json"
+                    self.walk_devices(self.load(path, referrer), path)
+
+    def walk_devices(self, node, referrer):
+        """Läuft rekursiv über Kategorien/Geräte und verfolgt deren Referenzen."""
+        if isinstance(node, list):
+            for item in node:
+                self.walk_devices(item, referrer)
+            return
+        if not isinstance(node, dict):
+            return
+
+        dev_type = node.get("type")
+        if dev_type == "light" and node.get("iconset"):
+            self.ref(f"assets/img/devices/light/light_{node['iconset']}.png", referrer)
+        if dev_type in DEVICE_IMAGE_DIRS and isinstance(node.get("image"), str):
+            self.ref(f"{DEVICE_IMAGE_DIRS[dev_type]}/{node['image']}", referrer)
+        if dev_type in PLUG_TYPES:
+            for key in ("imageOn", "imageOff"):
+                if node.get(key):
+                    self.ref(f"assets/img/devices/plug/{node[key]}", referrer)
+        if dev_type == "ioBroker_ical":
+            for cal in node.get("calendars", []):
+                if isinstance(cal, dict) and cal.get("image"):
+                    self.ref(f"assets/img/devices/ioBroker_ical/{cal['image']}", referrer)
+        if dev_type == "media":
+            self.walk_channels(node.get("channels", []), referrer)
+            for channellist in node.get("channellists", []) or []:
+                if isinstance(channellist, dict) and channellist.get("list"):
+                    path = f"data/helpers/mediaChannelLists/{channellist['list']}"
+                    channels = self.load(path, referrer)
+                    if channels is not None:
+                        self.walk_channels(channels, path)
+        if dev_type == "link":
+            slug = FUNCTIONS_LINK_MAP.get(str(node.get("value") or node.get("name") or "").strip())
+            if slug:
+                path = f"data/devices/functions/{slug}.json"
+                self.walk_devices(self.load(path, referrer), path)
+
+        for key in ("devices", "content"):
+            if isinstance(node.get(key), list):
+                self.walk_devices(node[key], referrer)
+
+    def walk_channels(self, channels, referrer):
+        if not isinstance(channels, list):
+            return
+        for channel in channels:
+            if isinstance(channel, dict) and channel.get("image"):
+                self.ref(f"assets/img/devices/media/channels/{channel['image']}", referrer)
+
+    # --- Ergebnis ---
+    def is_reachable(self, path):
+        if path in self.keep:
+            return True
+        return any(fnmatch.fnmatchcase(path, p) for p in self.patterns)
+
+
+def human_bytes(n):
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024 or unit == "MiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def analyze(layout, config):
+    reach = Reachability(layout, config)
+    reach.walk()
+    keep, prune = [], []
+    for path in sorted(layout):
+        if not path.startswith(PRUNE_SCOPE) or reach.is_reachable(path):
+            keep.append(path)
+        else:
+            prune.append(path)
+    return reach, keep, prune
+
+
+def print_report(reach, keep, prune, layout):
+    groups = {}
+    for path in prune:
+        parts = path.split("/")
+        group = "/".join(parts[:3]) if len(parts) > 3 else "/".join(parts[:-1])
+        count, size = groups.get(group, (0, 0))
+        groups[group] = (count + 1, size + layout[path].stat().st_size)
+
+    total = sum(size for _, size in groups.values())
+    kept = sum(layout[p].stat().st_size for p in keep)
+    print("Unerreichbare Dateien nach Ordner:")
+    for group, (count, size) in sorted(groups.items(), key=lambda g: -g[1][1]):
+        print(f"  {group:<50} {count:>5} Dateien  {human_bytes(size):>10}")
+    if reach.missing:
+        print("\nReferenziert, aber nicht vorhanden:")
+        for path, referrer in sorted(reach.missing.items()):
+            print(f"  {path}  (aus {referrer})")
+    for err in reach.errors:
+        print("[WARN]", err)
+    print(f"\nBehalten: {len(keep)} Dateien ({human_bytes(kept)})")
+    print(f"Entfernbar: {len(prune)} Dateien ({human_bytes(total)})")
+    return total
+
+
+def apply_prune(dist: Path, prune):
+    for path in prune:
+        (dist / path).unlink()
+    # leere Ordner von innen nach außen entfernen
+    for scope in PRUNE_SCOPE:
+        base = dist / scope
+        if not base.is_dir():
+            continue
+        for d in sorted((p for p in base.rglob("*") if p.is_dir()), key=lambda p: -len(p.parts)):
+            if not any(d.iterdir()):
+                d.rmdir()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ermittelt die minimale Dateimenge für dist/ und entfernt den Rest.")
+    parser.add_argument("--prod", action="store_true", help="config_prod.json statt config.json verwenden")
+    parser.add_argument("--dist", type=Path, default=DIST_DIR, help="dist-Ordner (Standard: %(default)s)")
+    parser.add_argument("--manifest", type=Path, help="Manifest (JSON) mit keep/prune/missing schreiben")
+    parser.add_argument("--apply", action="store_true", help="unerreichbare Dateien aus dist/ löschen")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.prod)
+    if args.dist.is_dir():
+        print("Analysiere dist:", args.dist)
+        layout = dist_layout(args.dist)
+        dist_config = layout.get("config.json")
+        if dist_config:
+            config = json.loads(dist_config.read_text(encoding="utf-8"))
+    else:
+        if args.apply:
+            print(f"FEHLER: dist-Ordner nicht gefunden: {args.dist} (zuerst gulp ausführen)")
+            sys.exit(1)
+        print("dist nicht gefunden, analysiere Quellen gemäß gulpfile.js:", ROOT / config.get("dataFolder", "data"))
+        layout = source_layout(config.get("dataFolder", "data"), args.prod)
+
+    reach, keep, prune = analyze(layout, config)
+    reclaimed = print_report(reach, keep, prune, layout)
+
+    if args.manifest:
+        manifest = {
+            "keep": keep,
+            "prune": prune,
+            "missing": sorted(reach.missing),
+            "reclaimed_bytes": reclaimed,
+        }
+        args.manifest.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        print("Manifest geschrieben:", args.manifest)
+
+    if args.apply:
+        apply_prune(args.dist, prune)
+        print(f"{len(prune)} Dateien aus {args.dist} entfernt, {human_bytes(reclaimed)} eingespart.")
+    print("Fertig.")
+
+
+if __name__ == "__main__":
+    main()
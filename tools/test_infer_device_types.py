@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests für infer_device_types.py (Präfix-Baum, Rollen-Fallback, Probelauf-Ausgabe).
+
+Aufruf:
+    python3 -m pytest tools/test_infer_device_types.py
+    python3 -m unittest tools/test_infer_device_types.py
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import infer_device_types as idt  # noqa: E402
+
+RULES = {
+    "min_confidence": 0.6,
+    "keep_types": ["link"],
+    "id_rules": [
+        {"id": "zigbee2mqtt.*.*.state", "type": "plug", "confidence": 0.55},
+        {"id": "zigbee2mqtt.*.*.state", "name": "lampe", "type": "light", "confidence": 0.85},
+        {"id": "sonoff.*.*.POWER[0-9]", "type": "plug", "confidence": 0.8},
+        {"id": "hue.**.on", "type": "light", "confidence": 0.9},
+        {"id": "tuya.**", "type": "plug", "confidence": 0.3},
+        {"id": "tuya.*.*.1", "type": "plug", "confidence": 0.7},
+    ],
+    "role_rules": [
+        {"role": "switch", "type": "plug", "confidence": 0.6},
+        {"role": "switch.light", "type": "light", "confidence": 0.95},
+    ],
+    "name_rules": [],
+}
+
+
+def labels(rules):
+    return sorted(r["label"] for r in rules)
+
+
+class PatternTrieTest(unittest.TestCase):
+    def setUp(self):
+        self.trie = idt.PatternTrie()
+        for pattern in ("a.*.c", "a.**.d", "a.b[0-9].c", "**.z"):
+            self.trie.add(pattern, {"label": pattern})
+
+    def test_star_matches_exactly_one_segment(self):
+        self.assertEqual(labels(self.trie.match("a.x.c")), ["a.*.c"])
+        self.assertEqual(self.trie.match("a.x.y.c"), [])
+
+    def test_globstar_matches_zero_or_more_segments(self):
+        self.assertEqual(labels(self.trie.match("a.d")), ["a.**.d"])
+        self.assertEqual(labels(self.trie.match("a.x.y.d")), ["a.**.d"])
+        self.assertEqual(labels(self.trie.match("z")), ["**.z"])
+
+    def test_glob_segment_and_star_both_match_once(self):
+        self.assertEqual(labels(self.trie.match("a.b1.c")), ["a.*.c", "a.b[0-9].c"])
+
+    def test_no_match(self):
+        self.assertEqual(self.trie.match("b.x.c"), [])
+
+
+class RuleEngineTest(unittest.TestCase):
+    def test_id_rules_combine_per_type(self):
+        dev_type, confidence, _ = idt.RuleEngine(RULES).classify("tuya.0.abc.1")
+        self.assertEqual(dev_type, "plug")
+        self.assertAlmostEqual(confidence, 1 - 0.7 * 0.3, places=3)
+
+    def test_name_condition_on_id_rule(self):
+        engine = idt.RuleEngine(RULES)
+        self.assertEqual(engine.classify("zigbee2mqtt.0.x.state", "Stehlampe")[0], "light")
+        self.assertEqual(engine.classify("zigbee2mqtt.0.x.state", "Kaffee")[0], "plug")
+
+    def test_role_falls_back_to_parent_role(self):
+        objects = {"alias.0.a.SET": "switch.light", "alias.0.b.SET": "switch.light.extra", "alias.0.c.SET": "switch.foo"}
+        engine = idt.RuleEngine(RULES, objects)
+        self.assertEqual(engine.classify("alias.0.a.SET")[:2], ("light", 0.95))
+        self.assertEqual(engine.classify("alias.0.b.SET")[:2], ("light", 0.95))
+        self.assertEqual(engine.classify("alias.0.c.SET")[:2], ("plug", 0.6))
+        self.assertIsNone(engine.classify("alias.0.d.SET"))
+
+    def test_unknown_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            idt.RuleEngine({"id_rules": [{"id": "x.*", "type": "toaster", "confidence": 0.5}]})
+
+
+class MainTest(unittest.TestCase):
+    def test_dry_run_with_relative_path_inside_repo(self):
+        cwd = os.getcwd()
+        os.chdir(idt.ROOT)
+        try:
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                idt.main(["data/devices/functions"])
+        finally:
+            os.chdir(cwd)
+        self.assertIn("Probelauf", out.getvalue())
+        self.assertNotIn(str(idt.ROOT), out.getvalue())
+
+    def test_dry_run_and_write_with_relative_path(self):
+        doc = [{"category": "Licht", "devices": [
+            {"name": "Stehlampe", "type": "switch", "value": "zigbee2mqtt.0.x.state"},
+            {"name": "Dashboard", "type": "link", "value": "sonoff.0.a.POWER1"},
+            {"name": "Platzhalter", "type": "button", "value": "xxx"},
+        ]}]
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            (tmp / "rules.json").write_text(json.dumps(RULES), encoding="utf-8")
+            (tmp / "functions").mkdir()
+            target = tmp / "functions" / "licht.json"
+            target.write_text(json.dumps(doc), encoding="utf-8")
+
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    idt.main(["--rules", "rules.json", "functions"])
+                self.assertIn("Stehlampe: switch -> light", out.getvalue())
+                self.assertEqual(json.loads(target.read_text(encoding="utf-8")), doc)
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    idt.main(["--rules", "rules.json", "--write", "functions"])
+            finally:
+                os.chdir(cwd)
+
+            written = json.loads(target.read_text(encoding="utf-8"))[0]["devices"]
+            self.assertEqual([d["type"] for d in written], ["light", "link", "button"])
+            self.assertEqual(json.loads((tmp / "functions" / "licht.json.pretype").read_text(encoding="utf-8")), doc)
+
+
+if __name__ == "__main__":
+    unittest.main()